@@ -0,0 +1,173 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+
+import degrees
+from landmarks import LandmarkIndex
+
+# Landmark index over degrees.graph, when requested
+index = None
+
+# Answer "at most k degrees apart?" instead of finding paths, when set
+within = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees-of-separation queries at once."
+    )
+    parser.add_argument("directory", nargs="?", default="small")
+    parser.add_argument(
+        "pairs", nargs="?",
+        help="CSV file of source,target names or IDs (default: stdin)"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="number of worker processes sharing the loaded graph"
+    )
+    parser.add_argument(
+        "-l", "--landmarks", type=int, default=0,
+        help="number of landmark people to index for goal-directed search"
+    )
+    parser.add_argument(
+        "-k", "--within", type=int,
+        help="only report whether each pair is at most this many degrees apart"
+    )
+    parser.add_argument(
+        "--load-workers", type=int, default=1,
+        help="number of processes used to parse stars.csv"
+    )
+    args = parser.parse_args()
+
+    global index, within
+    degrees.load_data(
+        args.directory, compact=True, cache=True, workers=args.load_workers
+    )
+    # Built before any workers fork, so they share it
+    degrees.build_name_index()
+    if args.landmarks > 0:
+        index = LandmarkIndex(degrees.graph, args.landmarks)
+    within = args.within
+
+    if args.pairs is None:
+        run(read_pairs(sys.stdin), args.workers, sys.stdout)
+    else:
+        with open(args.pairs, encoding="utf-8") as f:
+            run(read_pairs(f), args.workers, sys.stdout)
+
+
+def read_pairs(f):
+    """
+    Yields (source, target) pairs from CSV rows, skipping blank lines.
+    Rows without exactly two fields are yielded as they are,
+    for `answer` to report without stopping the job.
+    """
+    for row in csv.reader(f):
+        if not row:
+            continue
+        yield tuple(value.strip() for value in row)
+
+
+def run(pairs, workers, out):
+    """
+    Answers every pair and writes one JSON line per result to `out`,
+    in input order.
+
+    With more than one worker, queries are spread over a pool of
+    forked processes that share the already loaded data copy-on-write;
+    without fork, they are answered in this process.
+    """
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers) as pool:
+            for result in pool.imap(answer, pairs, chunksize=64):
+                write(out, result)
+    else:
+        for pair in pairs:
+            write(out, answer(pair))
+
+
+def write(out, result):
+    out.write(json.dumps(result) + "\n")
+    out.flush()
+
+
+def answer(pair):
+    """
+    Answers one (source, target) query and returns a JSON-ready dict
+    with the path and the time taken to find it.
+    """
+    if len(pair) != 2:
+        return {"row": list(pair), "error": "Expected source,target."}
+
+    start = time.perf_counter()
+    result = {"source": pair[0], "target": pair[1]}
+
+    source = person_id(pair[0])
+    target = person_id(pair[1])
+    if source is None or target is None:
+        result["error"] = "Person not found."
+        result["candidates"] = {
+            value: [candidate for candidate, _ in degrees.candidates_for_name(value, 5)]
+            for value, found in zip(pair, (source, target))
+            if found is None
+        }
+    elif within is not None:
+        result["within"] = is_within(source, target, within)
+    else:
+        path = find_path(source, target)
+        if path is None:
+            result["degrees"] = None
+            result["path"] = None
+        else:
+            result["degrees"] = len(path)
+            result["path"] = [list(step) for step in path]
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def find_path(source, target):
+    """
+    Returns the shortest path between two person IDs,
+    using the landmark index when one was built.
+    """
+    if index is None:
+        return degrees.shortest_path(source, target)
+    graph = degrees.graph
+    return degrees.ids_for_path(index.shortest_path(
+        graph.person_index[source], graph.person_index[target]
+    ))
+
+
+def is_within(source, target, k):
+    """
+    Returns whether two person IDs are at most `k` degrees apart.
+    """
+    if index is None:
+        path = degrees.shortest_path(source, target)
+        return path is not None and len(path) <= k
+    graph = degrees.graph
+    return index.within(
+        graph.person_index[source], graph.person_index[target], k
+    )
+
+
+def person_id(value):
+    """
+    Returns the person ID for an ID or an unambiguous name,
+    without prompting.
+    """
+    if value in degrees.people:
+        return value
+    person_ids = degrees.names.get(value.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import degrees
+from synthetic import generate
+
+# load_data keyword arguments for each loading strategy
+LOAD_MODES = {
+    "dict": {},
+    "compact": {"compact": True},
+    "parallel": {"compact": True, "workers": os.cpu_count() or 1},
+    "cache": {"cache": True},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading and querying the degrees dataset."
+    )
+    parser.add_argument(
+        "directory", nargs="?",
+        help="dataset to benchmark (default: generate a synthetic one)"
+    )
+    parser.add_argument("--people", type=int, default=100000)
+    parser.add_argument("--movies", type=int, default=30000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--load-only", choices=LOAD_MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.load_only:
+        print(json.dumps(measure_load(args.directory, args.load_only)))
+        return
+
+    if args.directory is None:
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"Generating {args.people} people and {args.movies} movies...")
+            generate(directory, args.people, args.movies, seed=args.seed)
+            run(directory, args.queries, args.seed)
+    else:
+        run(args.directory, args.queries, args.seed)
+
+
+def run(directory, queries, seed):
+    """
+    Prints load timings for every loading strategy,
+    then query latencies over the compactly loaded data.
+    """
+    print("Loading")
+    for mode in LOAD_MODES:
+        if mode != "cache":
+            report_load(directory, mode, mode)
+
+    # The cache is run twice, once to write the snapshot and once to read
+    # it, on a copy of the CSVs so that any snapshot already in
+    # `directory` is neither read by the first run nor overwritten
+    with tempfile.TemporaryDirectory() as copy:
+        for filename in ("people.csv", "movies.csv", "stars.csv"):
+            shutil.copy2(os.path.join(directory, filename), copy)
+        report_load(copy, "cache", "cache miss")
+        report_load(copy, "cache", "cache hit")
+
+    degrees.load_data(directory, compact=True)
+
+    # Kept apart from the generator's stream, which also started from `seed`
+    rng = random.Random(f"queries-{seed}")
+    pairs = sample_pairs(rng, queries)
+
+    print("Queries")
+    for kind, kind_pairs in pairs.items():
+        times = []
+        for source, target in kind_pairs:
+            start = time.perf_counter()
+            degrees.shortest_path(source, target)
+            times.append(time.perf_counter() - start)
+        print(f"  {kind:<12} {summarize(times)}")
+
+    times = []
+    for person_id in rng.sample(list(degrees.people), min(queries, len(degrees.people))):
+        start = time.perf_counter()
+        degrees.neighbors_for_person(person_id)
+        times.append(time.perf_counter() - start)
+    print(f"  {'neighbors':<12} {summarize(times)}")
+
+
+def report_load(directory, mode, label):
+    """
+    Prints the load time and peak memory of one loading strategy,
+    measured in a fresh process so that peak memory is its own.
+    """
+    stats = json.loads(subprocess.run(
+        [sys.executable, __file__, directory, "--load-only", mode],
+        check=True, capture_output=True, text=True
+    ).stdout)
+    print(f"  {label:<12} {stats['seconds']:8.3f} s  {stats['peak_mb']:8.1f} MB peak")
+
+
+def measure_load(directory, mode):
+    """
+    Loads the data once with the given strategy and returns
+    the time taken and the peak resident memory of this process.
+    """
+    start = time.perf_counter()
+    degrees.load_data(directory, **LOAD_MODES[mode])
+    seconds = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+    return {"seconds": seconds, "peak_mb": peak_mb}
+
+
+def sample_pairs(rng, count, per_source=10):
+    """
+    Returns up to `count` pairs of person_ids of each kind: "short"
+    (at most 2 degrees apart), "long" (among the farthest people from
+    the source) and "unreachable" (in different components).
+
+    Sources are drawn from the largest component, so that they have
+    near and far people to pair with, and each is searched once and
+    contributes up to `per_source` pairs of each kind.
+    """
+    graph = degrees.graph
+    n = len(graph.person_ids)
+    largest = Counter(graph.component).most_common(1)[0][0]
+    sources = [p for p in range(n) if graph.component[p] == largest]
+    pairs = {"short": [], "long": [], "unreachable": []}
+
+    for _ in range(10 * count // per_source + 1):
+        if all(len(kind_pairs) >= count for kind_pairs in pairs.values()):
+            break
+        source = rng.choice(sources)
+        distance = graph.distances(source)
+        deepest = max(distance)
+
+        targets = {
+            "short": [p for p in range(n) if 0 < distance[p] <= 2],
+            "long": [p for p in range(n) if distance[p] > 2 and distance[p] >= deepest - 1],
+            "unreachable": [p for p in range(n) if distance[p] == -1],
+        }
+        for kind, candidates in targets.items():
+            room = min(per_source, count - len(pairs[kind]), len(candidates))
+            if room > 0:
+                pairs[kind].extend((source, target) for target in rng.sample(candidates, room))
+
+    return {
+        kind: [(graph.person_ids[a], graph.person_ids[b]) for a, b in kind_pairs]
+        for kind, kind_pairs in pairs.items()
+    }
+
+
+def summarize(times):
+    """
+    Returns latency percentiles for a list of durations in seconds.
+    """
+    if not times:
+        return "no pairs found"
+    times = sorted(times)
+
+    def percentile(p):
+        return times[min(len(times) - 1, int(p / 100 * len(times)))] * 1000
+
+    return (
+        f"n={len(times):<5} p50 {percentile(50):8.3f} ms  "
+        f"p90 {percentile(90):8.3f} ms  p99 {percentile(99):8.3f} ms  "
+        f"max {times[-1] * 1000:8.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 import csv
+import gc
+import json
+import os
 import sys
+import threading
+from array import array
 
-from util import Node, StackFrontier, QueueFrontier
+import ingest
+from graph import Graph, _join_paths
+from nameindex import NameIndex
+from util import Node, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +20,41 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed CSR graph of people and movies, when loaded compactly
+graph = None
 
-def load_data(directory):
+# Prefix and fuzzy index over people's names, built on first use
+name_index = None
+name_index_lock = threading.Lock()
+
+# Compiled copy of a compactly loaded directory, written next to its CSVs
+SNAPSHOT = "snapshot.bin"
+SNAPSHOT_MAGIC = b"DEGSNAP\0"
+SNAPSHOT_VERSION = 5
+
+
+def load_data(directory, compact=False, cache=False, workers=1):
     """
     Load data from CSV files into memory.
+
+    If `compact` is true, the "movies" and "stars" sets are left out of
+    `people` and `movies`, and the stars are stored in `graph` instead.
+
+    If `cache` is true, data is loaded compactly from a snapshot in
+    `directory` when one matches the CSV files, and a new snapshot is
+    written after parsing the CSV files otherwise.
+
+    If `workers` is more than 1, compact loading parses stars.csv
+    in that many processes.
     """
+    global graph, name_index
+
+    if cache:
+        sources = _csv_signature(directory)
+        if _load_snapshot(directory, sources):
+            return
+        compact = True
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -24,8 +62,9 @@ def load_data(directory):
             people[row["id"]] = {
                 "name": row["name"],
                 "birth": row["birth"],
-                "movies": set()
             }
+            if not compact:
+                people[row["id"]]["movies"] = set()
             if row["name"].lower() not in names:
                 names[row["name"].lower()] = {row["id"]}
             else:
@@ -38,18 +77,193 @@ def load_data(directory):
             movies[row["id"]] = {
                 "title": row["title"],
                 "year": row["year"],
-                "stars": set()
             }
+            if not compact:
+                movies[row["id"]]["stars"] = set()
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    if compact and workers > 1:
+        graph = Graph(
+            people, movies,
+            *ingest.read_stars(f"{directory}/stars.csv", people, movies, workers)
+        )
+    elif compact:
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            graph = Graph.from_stars(
+                people, movies,
+                ((row["person_id"], row["movie_id"]) for row in reader)
+            )
+    else:
+        graph = None
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    people[row["person_id"]]["movies"].add(row["movie_id"])
+                    movies[row["movie_id"]]["stars"].add(row["person_id"])
+                except KeyError:
+                    pass
+
+    name_index = None
+
+    if cache:
+        _save_snapshot(directory, sources)
+
+
+def _csv_signature(directory):
+    """
+    Returns the size and modification time of each CSV file,
+    used to tell whether a snapshot is still current.
+    """
+    signature = []
+    for filename in ("people.csv", "movies.csv", "stars.csv"):
+        stat = os.stat(os.path.join(directory, filename))
+        signature.append((filename, stat.st_size, stat.st_mtime_ns))
+    return signature
+
+
+def _load_snapshot(directory, sources):
+    """
+    Loads data from the snapshot in `directory` with a single read.
+    Returns False if there is no snapshot or it is out of date.
+    """
+    try:
+        with open(os.path.join(directory, SNAPSHOT), "rb") as f:
+            data = memoryview(f.read())
+    except OSError:
+        return False
+
+    try:
+        header, strings, arrays = _parse_snapshot(data)
+        person_ids, person_names, births, movie_ids, titles, years = strings
+    except (ValueError, KeyError, TypeError):
+        return False
+    if header.get("sources") != [list(source) for source in sources]:
+        return False
+
+    global graph, name_index
+
+    # Creating this many small dicts would otherwise
+    # set off repeated, fruitless garbage collections
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        people.update(
+            (person_id, {"name": name, "birth": birth})
+            for person_id, name, birth in zip(person_ids, person_names, births)
+        )
+        for person_id, name in zip(person_ids, person_names):
+            key = name.lower()
+            if key in names:
+                names[key].add(person_id)
+            else:
+                names[key] = {person_id}
+        movies.update(
+            (movie_id, {"title": title, "year": year})
+            for movie_id, title, year in zip(movie_ids, titles, years)
+        )
+        graph = Graph.from_arrays(person_ids, movie_ids, arrays)
+    finally:
+        if collecting:
+            gc.enable()
+
+    name_index = None
+    return True
+
+
+def _parse_snapshot(data):
+    """
+    Splits the bytes of a snapshot into its header, string table
+    and graph arrays. Raises ValueError (or KeyError or TypeError, for
+    a damaged header) unless they are a snapshot of this version
+    written on a machine with the same byte order.
+    """
+    if bytes(data[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+        raise ValueError("not a snapshot")
+    position = len(SNAPSHOT_MAGIC)
+
+    def take(size):
+        nonlocal position
+        if size < 0 or position + size > len(data):
+            raise ValueError("truncated snapshot")
+        chunk = data[position:position + size]
+        position += size
+        return chunk
+
+    header = json.loads(bytes(take(int.from_bytes(take(8), "little"))))
+    if (
+        not isinstance(header, dict)
+        or header.get("version") != SNAPSHOT_VERSION
+        or header.get("byteorder") != sys.byteorder
+    ):
+        raise ValueError("incompatible snapshot")
+    strings = json.loads(bytes(take(header["strings"])))
+    if (
+        not isinstance(strings, list)
+        or len(strings) != 6
+        or len(set(map(len, strings[:3]))) != 1
+        or len(set(map(len, strings[3:]))) != 1
+    ):
+        raise ValueError("corrupt string table")
+    num_people, num_movies = len(strings[0]), len(strings[3])
+
+    if len(header["arrays"]) != len(Graph.ARRAYS):
+        raise ValueError("corrupt snapshot header")
+    arrays = {}
+    for (name, typecode), length in zip(Graph.ARRAYS, header["arrays"]):
+        values = array(typecode)
+        values.frombytes(take(length * values.itemsize))
+        arrays[name] = values
+
+    # Every index the graph looks up must be in range of these arrays
+    if (
+        len(arrays["person_offsets"]) != num_people + 1
+        or len(arrays["movie_offsets"]) != num_movies + 1
+        or arrays["person_offsets"][-1] != len(arrays["person_movies"])
+        or arrays["movie_offsets"][-1] != len(arrays["movie_people"])
+        or len(arrays["component"]) != num_people
+    ):
+        raise ValueError("corrupt graph arrays")
+    return header, strings, arrays
+
+
+def _save_snapshot(directory, sources):
+    """
+    Writes the loaded data to a snapshot in `directory`: a JSON header,
+    a JSON table of every ID, name, title, birth and year, then the raw
+    bytes of the graph's arrays. The snapshot is skipped if the
+    directory is not writable.
+    """
+    strings = json.dumps([
+        graph.person_ids,
+        [people[person_id]["name"] for person_id in graph.person_ids],
+        [people[person_id]["birth"] for person_id in graph.person_ids],
+        graph.movie_ids,
+        [movies[movie_id]["title"] for movie_id in graph.movie_ids],
+        [movies[movie_id]["year"] for movie_id in graph.movie_ids],
+    ]).encode("utf-8")
+    arrays = [getattr(graph, name) for name, _ in Graph.ARRAYS]
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "sources": sources,
+        "strings": len(strings),
+        "arrays": [len(values) for values in arrays],
+    }).encode("utf-8")
+
+    path = os.path.join(directory, SNAPSHOT)
+    try:
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            f.write(strings)
+            for values in arrays:
+                values.tofile(f)
+        os.replace(f"{path}.tmp", path)
+    except OSError:
+        pass
 
 
 def main():
@@ -59,7 +273,7 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, compact=True, cache=True)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +283,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = bidirectional_shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -91,10 +305,12 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
+    if graph is not None:
+        return _graph_shortest_path(source, target)
 
     # add initial node to frontier
     start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
+    frontier = DequeQueueFrontier()
     frontier.add(start)
 
     explored = set()
@@ -102,7 +318,7 @@ def shortest_path(source, target):
     while True:
 
         if frontier.empty():
-            raise Exception("no solution")
+            return None
 
         node = frontier.remove()
 
@@ -122,6 +338,112 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching outward
+    from both ends at once.
+
+    Each step expands one full layer of whichever side has the
+    smaller frontier, and stops at the layer where the two
+    searches first meet.
+
+    If no possible path, returns None.
+    """
+    if graph is not None:
+        return _graph_shortest_path(source, target)
+
+    if source == target:
+        return []
+
+    # Maps person_id to (movie_id, person_id) one step closer to the start
+    forward = {source: None}
+    backward = {target: None}
+
+    # Maps person_id to its depth from the start of its search
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # expand the smaller side
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, depth = forward_frontier, forward, forward_depth
+            other_depth = backward_depth
+        else:
+            frontier, parents, depth = backward_frontier, backward, backward_depth
+            other_depth = forward_depth
+
+        next_frontier = []
+        meeting = None
+        for person_id in frontier:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (movie_id, person_id)
+                depth[neighbor_id] = depth[person_id] + 1
+                next_frontier.append(neighbor_id)
+
+                if neighbor_id in other_depth:
+                    length = depth[neighbor_id] + other_depth[neighbor_id]
+                    if meeting is None or length < meeting[0]:
+                        meeting = (length, neighbor_id)
+
+        if meeting is not None:
+            return _join_paths(meeting[1], forward, backward)
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def _graph_shortest_path(source, target):
+    """
+    Runs the search over the CSR `graph` and translates
+    the resulting path back to IMDB ids.
+    """
+    return ids_for_path(graph.shortest_path(
+        graph.person_index[source], graph.person_index[target]
+    ))
+
+
+def ids_for_path(path):
+    """
+    Translates a list of (movie, person) index pairs in `graph`
+    to (movie_id, person_id) pairs. A path of None stays None.
+    """
+    if path is None:
+        return None
+    return [
+        (graph.movie_ids[movie], graph.person_ids[person])
+        for movie, person in path
+    ]
+
+
+def distances_from(person_id):
+    """
+    Returns a DistanceTable of every person's degrees of separation
+    from a person, found with a single search. The table works in
+    person indices; use `path_to` for paths in IMDB ids.
+    Data must be loaded compactly.
+    """
+    return graph.distance_table(graph.person_index[person_id])
+
+
+def path_to(table, person_id):
+    """
+    Returns the list of (movie_id, person_id) pairs from the source of
+    a DistanceTable to a person, or None if they are not connected.
+    """
+    return ids_for_path(table.path_to(graph.person_index[person_id]))
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -148,11 +470,40 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def candidates_for_name(name, limit=10):
+    """
+    Returns up to `limit` (person_id, score) pairs for people whose
+    names match a partial or misspelled name, best first,
+    without prompting.
+    """
+    return build_name_index().search(name, limit)
+
+
+def build_name_index():
+    """
+    Returns the name index over the loaded people, building it if this
+    is its first use. Long-running callers can build it up front, right
+    after `load_data`, so no query waits for it.
+    """
+    global name_index
+    with name_index_lock:
+        if name_index is None:
+            name_index = NameIndex(people)
+        return name_index
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        person = graph.person_index[person_id]
+        return {
+            (graph.movie_ids[movie], graph.person_ids[other])
+            for movie, other in graph.neighbors(person)
+        }
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
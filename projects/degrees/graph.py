@@ -0,0 +1,416 @@
+import hashlib
+from array import array
+
+
+class Graph():
+    """
+    Compact person/movie graph.
+
+    Person and movie IDs are interned to dense integers, and both
+    directions of the "stars" relation are stored in CSR form: the
+    movies of person i are
+        person_movies[person_offsets[i]:person_offsets[i + 1]]
+    and the people in movie j are
+        movie_people[movie_offsets[j]:movie_offsets[j + 1]].
+    """
+
+    # Integer arrays that, with the IDs, make up the whole graph
+    ARRAYS = (
+        ("person_offsets", "q"),
+        ("person_movies", "i"),
+        ("movie_offsets", "q"),
+        ("movie_people", "i"),
+        ("component", "i"),
+    )
+
+    def __init__(self, person_ids, movie_ids, star_people, star_movies):
+        """
+        Build the graph from the person and movie IDs, in index order,
+        and two parallel integer arrays giving the person index and
+        movie index of every star row. Duplicate rows are ignored.
+        """
+        self.person_ids = list(person_ids)
+        self.movie_ids = list(movie_ids)
+        self._index_ids()
+
+        star_people, star_movies = _unique_pairs(
+            star_people, star_movies, len(self.movie_ids)
+        )
+        self.person_offsets, self.person_movies = _csr(
+            len(self.person_ids), star_people, star_movies
+        )
+        self.movie_offsets, self.movie_people = _csr(
+            len(self.movie_ids), star_movies, star_people
+        )
+        self.component = self._label_components()
+
+    @classmethod
+    def from_stars(cls, person_ids, movie_ids, stars):
+        """
+        Build the graph from (person_id, movie_id) pairs,
+        skipping pairs whose person or movie is unknown.
+        """
+        person_ids = list(person_ids)
+        movie_ids = list(movie_ids)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        star_people = array("i")
+        star_movies = array("i")
+        for person_id, movie_id in stars:
+            try:
+                person = person_index[person_id]
+                movie = movie_index[movie_id]
+            except KeyError:
+                continue
+            star_people.append(person)
+            star_movies.append(movie)
+
+        return cls(person_ids, movie_ids, star_people, star_movies)
+
+    @classmethod
+    def from_arrays(cls, person_ids, movie_ids, arrays):
+        """
+        Rebuild a graph from its person and movie IDs and a dict
+        of the arrays named in ARRAYS, taken from an existing graph.
+        """
+        graph = cls.__new__(cls)
+        graph.person_ids = list(person_ids)
+        graph.movie_ids = list(movie_ids)
+        graph._index_ids()
+        for name, _ in cls.ARRAYS:
+            setattr(graph, name, arrays[name])
+        return graph
+
+    def _index_ids(self):
+        """
+        Builds the maps from person and movie IDs to their indices.
+        """
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(self.person_ids)
+        }
+        self.movie_index = {
+            movie_id: i for i, movie_id in enumerate(self.movie_ids)
+        }
+
+    def movies_for(self, person):
+        """
+        Returns the movie indices of a person index.
+        """
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def people_in(self, movie):
+        """
+        Returns the person indices of a movie index.
+        """
+        offsets = self.movie_offsets
+        return self.movie_people[offsets[movie]:offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person index.
+        """
+        for movie in self.movies_for(person):
+            for other in self.people_in(movie):
+                yield movie, other
+
+    def _label_components(self):
+        """
+        Returns an array mapping each person index to the label
+        of its connected component.
+        """
+        n = len(self.person_ids)
+        component = array("i", [-1]) * n
+        scanned = bytearray(len(self.movie_ids))
+
+        label = 0
+        for start in range(n):
+            if component[start] != -1:
+                continue
+            component[start] = label
+            stack = [start]
+            while stack:
+                person = stack.pop()
+                for movie in self.movies_for(person):
+                    if scanned[movie]:
+                        continue
+                    scanned[movie] = 1
+                    for other in self.people_in(movie):
+                        if component[other] == -1:
+                            component[other] = label
+                            stack.append(other)
+            label += 1
+
+        return component
+
+    def distances(self, source):
+        """
+        Returns an array with the number of degrees of separation
+        between the source index and every person index,
+        or -1 for people who are not connected to the source.
+        """
+        return self.distance_table(source).distance
+
+    def distance_table(self, source):
+        """
+        Runs one breadth-first search from the source index and returns
+        a DistanceTable of every person's distance and parent pointers.
+        """
+        n = len(self.person_ids)
+        distance = array("i", [-1]) * n
+        parent_person = array("i", [-1]) * n
+        parent_movie = array("i", [-1]) * n
+        scanned = bytearray(len(self.movie_ids))
+
+        distance[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for person in frontier:
+                for movie in self.movies_for(person):
+                    if scanned[movie]:
+                        continue
+                    scanned[movie] = 1
+                    for other in self.people_in(movie):
+                        if distance[other] == -1:
+                            distance[other] = depth
+                            parent_person[other] = person
+                            parent_movie[other] = movie
+                            next_frontier.append(other)
+            frontier = next_frontier
+
+        return DistanceTable(source, distance, parent_person, parent_movie)
+
+    def signature(self):
+        """
+        Returns a digest of the person and movie IDs, in index order,
+        and of who starred in what, identifying this exact graph.
+        """
+        digest = hashlib.sha256()
+        for ids in (self.person_ids, self.movie_ids):
+            digest.update("\n".join(ids).encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(self.person_offsets.tobytes())
+        digest.update(self.person_movies.tobytes())
+        return digest.digest()
+
+    def connected(self, source, target):
+        """
+        Returns whether two person indices are in the same component.
+        """
+        return self.component[source] == self.component[target]
+
+    def shortest_path(self, source, target, limit=None):
+        """
+        Returns the shortest list of (movie, person) index pairs
+        that connect the source index to the target index,
+        using a bidirectional breadth-first search.
+
+        If no possible path, or none of at most `limit` steps,
+        returns None.
+        """
+        if source == target:
+            return []
+        if not self.connected(source, target):
+            return None
+
+        # Maps person to (movie, person) one step closer to the start
+        forward = {source: None}
+        backward = {target: None}
+        forward_depth = {source: 0}
+        backward_depth = {target: 0}
+
+        # A movie only needs to be scanned once per side
+        forward_movies = set()
+        backward_movies = set()
+
+        forward_frontier = [source]
+        backward_frontier = [target]
+
+        # Number of layers expanded on each side
+        forward_layers = backward_layers = 0
+
+        while forward_frontier and backward_frontier:
+
+            # Not having met yet, the sides are more than this many steps apart
+            if limit is not None and forward_layers + backward_layers >= limit:
+                return None
+
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, depth = forward_frontier, forward, forward_depth
+                scanned, other_depth = forward_movies, backward_depth
+                forward_layers += 1
+            else:
+                frontier, parents, depth = backward_frontier, backward, backward_depth
+                scanned, other_depth = backward_movies, forward_depth
+                backward_layers += 1
+
+            next_frontier = []
+            meeting = None
+            for person in frontier:
+                next_depth = depth[person] + 1
+                for movie in self.movies_for(person):
+                    if movie in scanned:
+                        continue
+                    scanned.add(movie)
+                    for other in self.people_in(movie):
+                        if other in parents:
+                            continue
+                        parents[other] = (movie, person)
+                        depth[other] = next_depth
+                        next_frontier.append(other)
+
+                        if other in other_depth:
+                            length = next_depth + other_depth[other]
+                            if meeting is None or length < meeting[0]:
+                                meeting = (length, other)
+
+            if meeting is not None:
+                return _join_paths(meeting[1], forward, backward)
+
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        return None
+
+
+class DistanceTable():
+    """
+    Degrees of separation from one source person to every person,
+    as parallel arrays indexed by person index. The parent arrays
+    hold the person and movie one step closer to the source,
+    or -1 for the source and unconnected people.
+    """
+
+    MAGIC = b"DEGDIST2"
+
+    def __init__(self, source, distance, parent_person, parent_movie):
+        self.source = source
+        self.distance = distance
+        self.parent_person = parent_person
+        self.parent_movie = parent_movie
+
+    def distance_to(self, person):
+        """
+        Returns the degrees of separation of a person index,
+        or None if they are not connected to the source.
+        """
+        distance = self.distance[person]
+        return None if distance == -1 else distance
+
+    def path_to(self, person):
+        """
+        Returns the list of (movie, person) index pairs from the source
+        to a person index, or None if they are not connected.
+        """
+        if self.distance[person] == -1:
+            return None
+        path = []
+        while person != self.source:
+            path.append((self.parent_movie[person], person))
+            person = self.parent_person[person]
+        path.reverse()
+        return path
+
+    def save(self, filename, graph):
+        """
+        Writes the table, found on `graph`, to a binary file
+        along with the graph's signature.
+        """
+        header = array("q", [self.source, len(self.distance)])
+        with open(filename, "wb") as f:
+            f.write(self.MAGIC)
+            f.write(graph.signature())
+            header.tofile(f)
+            self.distance.tofile(f)
+            self.parent_person.tofile(f)
+            self.parent_movie.tofile(f)
+
+    @classmethod
+    def load(cls, filename, graph):
+        """
+        Reads a table written by `save`. Raises ValueError unless it
+        was saved for a graph with the same signature as `graph`, since
+        its indices and distances are meaningless for any other graph.
+        """
+        signature = graph.signature()
+        with open(filename, "rb") as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"{filename} is not a distance table")
+            if f.read(len(signature)) != signature:
+                raise ValueError(f"{filename} was saved for a different graph")
+            header = array("q")
+            header.fromfile(f, 2)
+            source, n = header
+            arrays = []
+            for _ in range(3):
+                values = array("i")
+                values.fromfile(f, n)
+                arrays.append(values)
+        return cls(source, *arrays)
+
+
+def _join_paths(middle, forward, backward):
+    """
+    Rebuilds the path through `middle` from the parent maps
+    of a bidirectional search.
+    """
+    path = []
+    person = middle
+    while forward[person] is not None:
+        movie, parent = forward[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    person = middle
+    while backward[person] is not None:
+        movie, child = backward[person]
+        path.append((movie, child))
+        person = child
+
+    return path
+
+
+def _unique_pairs(keys, values, width):
+    """
+    Returns copies of two parallel integer arrays
+    with repeated (key, value) pairs removed.
+    """
+    seen = set()
+    unique_keys = array("i")
+    unique_values = array("i")
+    for key, value in zip(keys, values):
+        pair = key * width + value
+        if pair in seen:
+            continue
+        seen.add(pair)
+        unique_keys.append(key)
+        unique_values.append(value)
+    return unique_keys, unique_values
+
+
+def _csr(n, keys, values):
+    """
+    Groups `values` by `keys` with a counting sort.
+    Returns (offsets, indices) arrays for `n` keys.
+    """
+    offsets = array("q", bytes(8 * (n + 1)))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    indices = array("i", bytes(4 * len(values)))
+    position = offsets[:-1]
+    for key, value in zip(keys, values):
+        indices[position[key]] = value
+        position[key] += 1
+
+    return offsets, indices
@@ -0,0 +1,101 @@
+import csv
+import io
+import multiprocessing
+import os
+from array import array
+
+# Aim for several chunks per worker so uneven chunks even out
+CHUNKS_PER_WORKER = 4
+
+# Index maps for the chunk parser, inherited by forked workers
+_person_index = {}
+_movie_index = {}
+
+
+def read_stars(filename, person_ids, movie_ids, workers):
+    """
+    Parses a stars CSV in parallel and returns two parallel arrays
+    with the person index and movie index of every row, in file order,
+    where indices are positions in `person_ids` and `movie_ids`.
+    Rows naming an unknown person or movie are skipped.
+
+    The file is split into byte ranges at line boundaries, so no field
+    may contain a newline, which holds for the numeric IDs in stars.csv.
+    Workers are forked and share the index maps copy-on-write;
+    without fork, the chunks are parsed in this process.
+    """
+    global _person_index, _movie_index
+    _person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    _movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+    with open(filename, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]))
+        start = f.tell()
+    columns = (header.index("person_id"), header.index("movie_id"))
+    chunks = [
+        (filename, begin, end, columns)
+        for begin, end in _chunk_ranges(filename, start, workers * CHUNKS_PER_WORKER)
+    ]
+
+    try:
+        if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+            with context.Pool(workers) as pool:
+                results = pool.map(_parse_chunk, chunks)
+        else:
+            results = [_parse_chunk(chunk) for chunk in chunks]
+    finally:
+        _person_index = {}
+        _movie_index = {}
+
+    star_people = array("i")
+    star_movies = array("i")
+    for chunk_people, chunk_movies in results:
+        star_people.extend(chunk_people)
+        star_movies.extend(chunk_movies)
+    return star_people, star_movies
+
+
+def _chunk_ranges(filename, start, count):
+    """
+    Splits the bytes of a file from `start` to its end into up to
+    `count` (begin, end) ranges, each ending just after a newline.
+    """
+    size = os.path.getsize(filename)
+    step = max(1, (size - start) // max(1, count))
+
+    ranges = []
+    with open(filename, "rb") as f:
+        begin = start
+        while begin < size:
+            f.seek(min(begin + step, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((begin, end))
+            begin = end
+    return ranges
+
+
+def _parse_chunk(chunk):
+    """
+    Returns (people, movies) index arrays for the rows
+    in one byte range of a stars CSV.
+    """
+    filename, begin, end, (person_column, movie_column) = chunk
+    with open(filename, "rb") as f:
+        f.seek(begin)
+        text = f.read(end - begin).decode("utf-8")
+
+    people = array("i")
+    movies = array("i")
+    for row in csv.reader(io.StringIO(text)):
+        if not row:
+            continue
+        try:
+            person = _person_index[row[person_column]]
+            movie = _movie_index[row[movie_column]]
+        except (KeyError, IndexError):
+            continue
+        people.append(person)
+        movies.append(movie)
+    return people, movies
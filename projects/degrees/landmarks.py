@@ -0,0 +1,137 @@
+class LandmarkIndex():
+    """
+    Landmark distance index over a Graph.
+
+    For a few well-connected landmark people, a DistanceTable of the
+    degrees of separation from the landmark to every person is kept.
+    By the triangle inequality, for any landmark L,
+        |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t)
+    which often settles a distance, or whether it is within a bound,
+    without searching. Otherwise the graph's bidirectional search is
+    run, depth-limited only when answering `within`.
+    """
+
+    def __init__(self, graph, count=4):
+        self.graph = graph
+        self.landmarks = self._choose(count)
+        self.tables = [graph.distance_table(landmark) for landmark in self.landmarks]
+        self.distances = [table.distance for table in self.tables]
+
+    def _choose(self, count):
+        """
+        Returns the `count` people with the most co-star slots,
+        taking at most one landmark per movie so they are spread out.
+        """
+        graph = self.graph
+        movie_offsets = graph.movie_offsets
+
+        def degree(person):
+            return sum(
+                movie_offsets[movie + 1] - movie_offsets[movie]
+                for movie in graph.movies_for(person)
+            )
+
+        landmarks = []
+        used = set()
+        for person in sorted(range(len(graph.person_ids)), key=degree, reverse=True):
+            if len(landmarks) == count:
+                break
+            movies = set(graph.movies_for(person))
+            if not movies or movies & used:
+                continue
+            landmarks.append(person)
+            used |= movies
+        return landmarks
+
+    def lower_bound(self, source, target):
+        """
+        Returns a lower bound on the degrees of separation between
+        two connected person indices.
+        """
+        bound = 0
+        for distance in self.distances:
+            s, t = distance[source], distance[target]
+            if s != -1 and t != -1:
+                bound = max(bound, abs(s - t))
+        return bound
+
+    def upper_bound(self, source, target):
+        """
+        Returns an upper bound on the degrees of separation between
+        two person indices, or None if no landmark reaches both.
+        """
+        best = self._best_landmark(source, target)
+        if best is None:
+            return None
+        return best.distance[source] + best.distance[target]
+
+    def _best_landmark(self, source, target):
+        """
+        Returns the DistanceTable of the landmark giving the shortest
+        route between two person indices, or None if none reaches both.
+        """
+        best = None
+        bound = None
+        for table in self.tables:
+            s, t = table.distance[source], table.distance[target]
+            if s != -1 and t != -1 and (bound is None or s + t < bound):
+                best, bound = table, s + t
+        return best
+
+    def within(self, source, target, k):
+        """
+        Returns whether two person indices are separated by at most
+        `k` degrees, searching only if the landmark bounds disagree.
+        """
+        if not self.graph.connected(source, target):
+            return False
+        if self.lower_bound(source, target) > k:
+            return False
+        upper = self.upper_bound(source, target)
+        if upper is not None and upper <= k:
+            return True
+        return self.graph.shortest_path(source, target, limit=k) is not None
+
+    def distance(self, source, target):
+        """
+        Returns the degrees of separation between two person indices,
+        or None if they are not connected.
+        """
+        if not self.graph.connected(source, target):
+            return None
+        upper = self.upper_bound(source, target)
+        if upper is not None and upper == self.lower_bound(source, target):
+            return upper
+        return len(self.graph.shortest_path(source, target))
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie, person) index pairs
+        that connect the source index to the target index.
+
+        When the landmark bounds agree, the route through the best
+        landmark is a shortest path and is read from its table;
+        otherwise the graph is searched. If no possible path,
+        returns None.
+        """
+        if source == target:
+            return []
+        if not self.graph.connected(source, target):
+            return None
+
+        best = self._best_landmark(source, target)
+        if (
+            best is None
+            or best.distance[source] + best.distance[target]
+            > self.lower_bound(source, target)
+        ):
+            return self.graph.shortest_path(source, target)
+
+        # Walk from the source back up to the landmark, then down to the target
+        path = []
+        person = source
+        while person != best.source:
+            parent = best.parent_person[person]
+            path.append((best.parent_movie[person], parent))
+            person = parent
+        return path + best.path_to(target)
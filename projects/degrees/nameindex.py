@@ -0,0 +1,128 @@
+import bisect
+import difflib
+from array import array
+from collections import Counter
+
+
+class NameIndex():
+    """
+    Index of people's names for prefix and misspelling-tolerant lookup.
+
+    Lower-cased names are kept in a sorted list, so the names starting
+    with a prefix form one contiguous run found with bisect. Each
+    position in the list is also filed under the trigrams of its name,
+    so similar names can be found without scanning every name.
+    """
+
+    # Stop collecting fuzzy candidates after this many trigram postings
+    MAX_POSTINGS = 20000
+
+    def __init__(self, people):
+        """
+        Build the index from a dict mapping person_ids to dicts
+        with a "name" key, like `degrees.people`.
+        """
+        entries = sorted(
+            (person["name"].lower(), person_id)
+            for person_id, person in people.items()
+        )
+        self.keys = [key for key, _ in entries]
+        self.person_ids = [person_id for _, person_id in entries]
+
+        trigrams = {}
+        for position, key in enumerate(self.keys):
+            for trigram in set(_trigrams(key)):
+                if trigram not in trigrams:
+                    trigrams[trigram] = array("i")
+                trigrams[trigram].append(position)
+        self.trigrams = trigrams
+
+    def prefix(self, name, limit=10):
+        """
+        Returns up to `limit` person_ids whose name starts with `name`,
+        in alphabetical order of name.
+        """
+        positions = self._prefix_positions(name.lower(), limit)
+        return [self.person_ids[position] for position in positions[:limit]]
+
+    def search(self, name, limit=10):
+        """
+        Returns up to `limit` (person_id, score) pairs for the names
+        most like `name`, best first.
+
+        Exact matches score 1, other names starting with `name`
+        score just below 1, and the rest are scored by similarity.
+        """
+        key = name.lower().strip()
+        if not key:
+            return []
+
+        scores = {}
+        for position in self._prefix_positions(key, limit):
+            score = 1.0 if self.keys[position] == key else 0.99
+            scores[position] = score
+
+        # Names starting with `name` outrank any fuzzy match
+        if len(scores) < limit:
+            self._score_similar(key, limit, scores)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.keys[item[0]]))
+        return [(self.person_ids[position], score) for position, score in ranked[:limit]]
+
+    def _score_similar(self, key, limit, scores):
+        """
+        Adds similarity scores for the names sharing the most
+        trigrams with `key` that are not already in `scores`.
+        """
+        matcher = difflib.SequenceMatcher(b=key)
+        for position in self._similar_positions(key, limit):
+            if position in scores:
+                continue
+            matcher.set_seq1(self.keys[position])
+            scores[position] = round(matcher.ratio(), 4)
+
+    def _prefix_positions(self, key, limit):
+        """
+        Returns positions of names starting with `key`, keeping
+        every exact match even past `limit`.
+        """
+        start = bisect.bisect_left(self.keys, key)
+        positions = []
+        for position in range(start, len(self.keys)):
+            candidate = self.keys[position]
+            if not candidate.startswith(key):
+                break
+            if len(positions) >= limit and candidate != key:
+                break
+            positions.append(position)
+        return positions
+
+    def _similar_positions(self, key, limit):
+        """
+        Returns positions of the names sharing the most trigrams
+        with `key`, reading the rarest trigrams' postings first.
+        """
+        postings = sorted(
+            (self.trigrams[trigram] for trigram in set(_trigrams(key))
+             if trigram in self.trigrams),
+            key=len
+        )
+
+        shared = Counter()
+        read = 0
+        for positions in postings:
+            if read and read + len(positions) > self.MAX_POSTINGS:
+                break
+            shared.update(positions)
+            read += len(positions)
+
+        return [position for position, _ in shared.most_common(limit * 5)]
+
+
+def _trigrams(key):
+    """
+    Returns the trigrams of a name, padded so that
+    short names and word boundaries are represented.
+    """
+    padded = f"  {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
@@ -0,0 +1,189 @@
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+from batch import person_id
+
+
+class LRUCache():
+    """
+    Thread-safe mapping that keeps at most `maxsize` entries,
+    evicting the least recently used, and counts hits and misses.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+            }
+
+
+# Recent shortest_path results, keyed by (source, target) person IDs
+cache = LRUCache(10000)
+
+# Marks a cached "not connected" result, since the cache returns None on a miss
+NOT_CONNECTED = "not connected"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve degrees-of-separation queries over HTTP."
+    )
+    parser.add_argument("directory", nargs="?", default="small")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument(
+        "--cache-size", type=int, default=10000,
+        help="number of recent path results to keep"
+    )
+    parser.add_argument(
+        "--load-workers", type=int, default=1,
+        help="number of processes used to parse stars.csv"
+    )
+    args = parser.parse_args()
+
+    cache.maxsize = args.cache_size
+
+    print("Loading data...")
+    degrees.load_data(
+        args.directory, compact=True, cache=True, workers=args.load_workers
+    )
+    degrees.build_name_index()
+    print("Data loaded.")
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def cached_shortest_path(source, target):
+    """
+    Returns (path, cached) for two person IDs,
+    reusing a recent result when there is one.
+    """
+    path = cache.get((source, target))
+    if path is not None:
+        return (None if path == NOT_CONNECTED else path), True
+
+    path = degrees.shortest_path(source, target)
+    cache.put((source, target), NOT_CONNECTED if path is None else path)
+    return path, False
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Answers
+        GET /path?source=...&target=...  (names or IDs)
+        GET /person?name=...&limit=...  (ranked, partial or misspelled)
+        GET /stats
+    with JSON bodies.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == "/path":
+            self.path_query(query)
+        elif url.path == "/person":
+            self.person_query(query)
+        elif url.path == "/stats":
+            self.respond(200, {"cache": cache.stats()})
+        else:
+            self.respond(404, {"error": "Not found."})
+
+    def path_query(self, query):
+        if "source" not in query or "target" not in query:
+            self.respond(400, {"error": "Expected source and target."})
+            return
+
+        source = person_id(query["source"])
+        target = person_id(query["target"])
+        if source is None or target is None:
+            self.respond(404, {"error": "Person not found."})
+            return
+
+        path, cached = cached_shortest_path(source, target)
+        self.respond(200, {
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": path,
+            "cached": cached,
+        })
+
+    def person_query(self, query):
+        if "name" not in query:
+            self.respond(400, {"error": "Expected name."})
+            return
+
+        try:
+            limit = int(query.get("limit", 10))
+        except ValueError:
+            limit = -1
+        if limit < 0:
+            self.respond(400, {"error": "Expected limit to be a non-negative integer."})
+            return
+
+        candidates = degrees.candidates_for_name(query["name"], limit)
+        self.respond(200, {
+            "people": [
+                {
+                    "id": person_id,
+                    "name": degrees.people[person_id]["name"],
+                    "birth": degrees.people[person_id]["birth"],
+                    "score": score,
+                }
+                for person_id, score in candidates
+            ]
+        })
+
+    def respond(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic people/movies/stars dataset."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--people", type=int, default=100000)
+    parser.add_argument("--movies", type=int, default=30000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.directory, args.people, args.movies, seed=args.seed)
+
+
+def generate(directory, num_people, num_movies, cast_size=8, skew=0.8,
+             isolated=0.01, seed=0):
+    """
+    Write people.csv, movies.csv and stars.csv to `directory`.
+
+    Cast sizes are drawn from a long-tailed distribution around
+    `cast_size`, and casts are filled by preference for prolific
+    people (Zipf-like, with exponent `skew`), so a few people appear
+    in very many movies and most appear in one or two.
+
+    Every person has at least one role, except for 0.1% who star
+    in nothing. A fraction `isolated` of people and movies forms
+    small islands that never share a movie with the rest, so
+    unreachable pairs exist beyond those few loners.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    island_people = int(num_people * isolated)
+    island_movies = int(num_movies * isolated)
+    main_people = num_people - island_people
+    main_movies = num_movies - island_movies
+
+    # Person ids are shuffled so popularity is not visible in id order
+    person_ids = list(range(1, num_people + 1))
+    rng.shuffle(person_ids)
+    movie_ids = list(range(1, num_movies + 1))
+
+    with open(os.path.join(directory, "people.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        f.write("id,name,birth\n")
+        for person_id in sorted(person_ids):
+            # Reuse some names so that name lookups are ambiguous
+            name = f"Person {person_id % (num_people * 9 // 10) or num_people}"
+            writer.writerow([person_id, name, rng.randint(1900, 2010)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        f.write("id,title,year\n")
+        for movie_id in movie_ids:
+            writer.writerow([movie_id, f"Movie {movie_id}", rng.randint(1920, 2020)])
+
+    with open(os.path.join(directory, "stars.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        f.write("person_id,movie_id\n")
+
+        # The main cast pool, leaving 0.1% of people in no movies at all
+        pool = person_ids[:main_people - main_people // 1000]
+        weights = list(itertools.accumulate(
+            1 / (rank + 1) ** skew for rank in range(len(pool))
+        ))
+
+        # Each cast starts with the next few newcomers from the pool,
+        # so everyone in it gets a role, and is filled by popularity
+        main = movie_ids[:main_movies]
+        position = 0
+        for i, movie_id in enumerate(main):
+            size = min(len(pool), _cast_size(rng, cast_size))
+            count = _share(len(pool) - position, len(main) - i)
+            cast = set(pool[position:position + count])
+            position += count
+            cast.update(rng.choices(pool, cum_weights=weights, k=max(1, size - count)))
+            for person_id in cast:
+                writer.writerow([person_id, movie_id])
+
+        # Islands of a few people each, disjoint from the main pool;
+        # once every islander has a role, movies go to random islands
+        islands = person_ids[main_people:]
+        rest = movie_ids[main_movies:]
+        position = 0
+        for i, movie_id in enumerate(rest):
+            if not islands:
+                break
+            count = max(rng.randint(1, 5), _share(len(islands) - position, len(rest) - i))
+            if position < len(islands):
+                start = position
+                position += count
+            else:
+                start = rng.randrange(len(islands))
+            for person_id in islands[start:start + count]:
+                writer.writerow([person_id, movie_id])
+
+
+def _share(people, movies):
+    """
+    Returns how many of `people` still without a role
+    the next of `movies` remaining movies should take.
+    """
+    return -(-people // movies) if people > 0 else 0
+
+
+def _cast_size(rng, mean):
+    """
+    Returns a cast size of at least 1, usually near `mean`
+    with an occasional very large ensemble.
+    """
+    return max(1, int(rng.lognormvariate(0, 0.75) * mean * 0.75))
+
+
+if __name__ == "__main__":
+    main()
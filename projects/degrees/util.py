@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +39,46 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    def __init__(self):
+        self.frontier = deque()
+        # Maps each state to how many nodes in the frontier hold it
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self._discard(node.state)
+            return node
+
+    def _discard(self, state):
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self._discard(node.state)
+            return node
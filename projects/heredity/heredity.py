@@ -2,6 +2,8 @@ import csv
 import itertools
 import sys
 
+from inference import child_gene_probability, eliminate
+
 PROBS = {
     # Unconditional probabilities for having gene
     "gene": {2: 0.01, 1: 0.03, 0: 0.96},
@@ -21,10 +23,30 @@ PROBS = {
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in (2, 3) or (len(sys.argv) == 3 and sys.argv[2] not in METHODS):
+        sys.exit(f"Usage: python heredity.py data.csv [{'|'.join(METHODS)}]")
     people = load_data(sys.argv[1])
 
+    # Compute gene and trait probabilities for each person
+    method = sys.argv[2] if len(sys.argv) == 3 else "enumerate"
+    probabilities = METHODS[method](people)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
+def enumerate_probabilities(people):
+    """
+    Return normalized gene and trait distributions for each person by
+    summing `joint_probability` over every assignment of genes and traits.
+    """
+
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {"gene": {2: 0, 1: 0, 0: 0}, "trait": {True: 0, False: 0}}
@@ -56,15 +78,88 @@ def main():
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
+    return probabilities
 
-    # Print results
+
+def marginalize_probabilities(people):
+    """
+    Return normalized gene and trait distributions for each person by
+    enumerating gene assignments only.
+
+    A person's trait depends only on their own genes, so instead of
+    enumerating traits, each gene assignment is weighted by the
+    probability of the known traits, and each unknown trait is split
+    between True and False by its probability given the person's genes.
+    """
+    probabilities = {
+        person: {"gene": {2: 0, 1: 0, 0: 0}, "trait": {True: 0, False: 0}}
+        for person in people
+    }
+
+    names = set(people)
+    for one_gene in powerset(names):
+        for two_genes in powerset(names - one_gene):
+            genes = {
+                person: 2 if person in two_genes else 1 if person in one_gene else 0
+                for person in names
+            }
+            p = evidence_probability(people, genes)
+
+            for person in names:
+                probabilities[person]["gene"][genes[person]] += p
+                trait = people[person]["trait"]
+                if trait is not None:
+                    probabilities[person]["trait"][trait] += p
+                else:
+                    for value in (True, False):
+                        probabilities[person]["trait"][value] += (
+                            p * PROBS["trait"][genes[person]][value]
+                        )
+
+    normalize(probabilities)
+    return probabilities
+
+
+def evidence_probability(people, genes):
+    """
+    Return the probability that everyone has the number of genes given
+    in the dictionary `genes` and that everyone whose trait is known
+    has it (or not) as recorded.
+    """
+    probability = 1
     for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+        mother = people[person]["mother"]
+        father = people[person]["father"]
+        if not mother and not father:
+            probability *= PROBS["gene"][genes[person]]
+        else:
+            probability *= child_gene_probability(
+                genes[person], genes[mother], genes[father], PROBS
+            )
+
+        trait = people[person]["trait"]
+        if trait is not None:
+            probability *= PROBS["trait"][genes[person]][trait]
+    return probability
+
+
+def eliminate_probabilities(people):
+    """
+    Return normalized gene and trait distributions for each person by
+    variable elimination, which takes polynomial rather than exponential
+    time in the size of tree-like families.
+    """
+    return eliminate(people, PROBS)
+
+
+def vectorize_probabilities(people):
+    """
+    Return normalized gene and trait distributions for each person by
+    scoring integer-encoded gene assignments in blocks with NumPy.
+    """
+    # Imported here so that NumPy is only needed for this method
+    from vectorized import vectorized_probabilities
+    return vectorized_probabilities(people, PROBS)
 
 
 def load_data(filename):
@@ -229,5 +324,14 @@ def normalize(probabilities):
         }
 
 
+# Ways of computing each person's gene and trait distributions
+METHODS = {
+    "enumerate": enumerate_probabilities,
+    "marginalize": marginalize_probabilities,
+    "eliminate": eliminate_probabilities,
+    "vectorize": vectorize_probabilities,
+}
+
+
 if __name__ == "__main__":
     main()
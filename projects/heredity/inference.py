@@ -0,0 +1,163 @@
+import itertools
+
+GENES = (2, 1, 0)
+
+
+def inheritance(genes, probs):
+    """
+    Return the probability that a parent with `genes` copies of the gene
+    passes one copy on to a child, allowing for mutation.
+    """
+    if genes == 2:
+        return 1 - probs["mutation"]
+    if genes == 1:
+        return 0.5
+    return probs["mutation"]
+
+
+def child_gene_probability(child, mother, father, probs):
+    """
+    Return the probability that a child has `child` copies of the gene
+    given the number of copies their mother and father have.
+    """
+    from_mother = inheritance(mother, probs)
+    from_father = inheritance(father, probs)
+    if child == 2:
+        return from_mother * from_father
+    if child == 1:
+        return from_mother * (1 - from_father) + (1 - from_mother) * from_father
+    return (1 - from_mother) * (1 - from_father)
+
+
+class Factor():
+    """
+    Non-negative function of some people's gene counts, stored as a
+    table mapping each combination of counts (in the order of
+    `variables`) to a value.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = tuple(variables)
+        self.table = table
+
+    def multiply(self, other):
+        """
+        Return the product of two factors, over the union of their people.
+        """
+        variables = self.variables + tuple(
+            v for v in other.variables if v not in self.variables
+        )
+        mine = [variables.index(v) for v in self.variables]
+        theirs = [variables.index(v) for v in other.variables]
+        table = {}
+        for assignment in itertools.product(GENES, repeat=len(variables)):
+            table[assignment] = (
+                self.table[tuple(assignment[i] for i in mine)]
+                * other.table[tuple(assignment[i] for i in theirs)]
+            )
+        return Factor(variables, table)
+
+    def sum_out(self, variable):
+        """
+        Return this factor summed over every gene count of `variable`.
+        """
+        position = self.variables.index(variable)
+        variables = self.variables[:position] + self.variables[position + 1:]
+        table = {}
+        for assignment, value in self.table.items():
+            key = assignment[:position] + assignment[position + 1:]
+            table[key] = table.get(key, 0) + value
+        return Factor(variables, table)
+
+
+def person_factors(people, probs):
+    """
+    Return one factor per person: the probability of their gene count
+    given their parents' (or unconditionally, for people without
+    parents in the data), times the probability of their trait if it
+    is known. An unknown trait sums to 1 and so adds nothing.
+    """
+    factors = []
+    for person, data in people.items():
+        trait = data["trait"]
+
+        def evidence(genes):
+            return 1 if trait is None else probs["trait"][genes][trait]
+
+        mother, father = data["mother"], data["father"]
+        if not mother and not father:
+            table = {(g,): probs["gene"][g] * evidence(g) for g in GENES}
+            factors.append(Factor((person,), table))
+        else:
+            table = {
+                (g, m, f): child_gene_probability(g, m, f, probs) * evidence(g)
+                for g, m, f in itertools.product(GENES, repeat=3)
+            }
+            factors.append(Factor((person, mother, father), table))
+    return factors
+
+
+def gene_posterior(factors, person):
+    """
+    Return the distribution of `person`'s gene count given the evidence,
+    eliminating every other person from `factors`.
+
+    People are eliminated greedily, always choosing the one whose
+    elimination creates the smallest factor, which for tree-like
+    pedigrees keeps every factor over a handful of people.
+    """
+    factors = list(factors)
+    others = set(v for factor in factors for v in factor.variables) - {person}
+
+    while others:
+        def cost(variable):
+            merged = set()
+            for factor in factors:
+                if variable in factor.variables:
+                    merged.update(factor.variables)
+            return len(merged)
+
+        variable = min(others, key=lambda v: (cost(v), v))
+        others.remove(variable)
+
+        related = [factor for factor in factors if variable in factor.variables]
+        factors = [factor for factor in factors if variable not in factor.variables]
+        product = related[0]
+        for factor in related[1:]:
+            product = product.multiply(factor)
+        factors.append(product.sum_out(variable))
+
+    result = factors[0]
+    for factor in factors[1:]:
+        result = result.multiply(factor)
+    total = sum(result.table.values())
+    return {g: result.table[(g,)] / total for g in GENES}
+
+
+def trait_posterior(trait, genes, probs):
+    """
+    Return the distribution of a person's trait given whether it is
+    known (`trait`) and the distribution of their gene count (`genes`).
+    """
+    if trait is not None:
+        return {True: float(trait), False: float(not trait)}
+    has_trait = sum(genes[g] * probs["trait"][g][True] for g in GENES)
+    return {True: has_trait, False: 1 - has_trait}
+
+
+def eliminate(people, probs):
+    """
+    Return normalized gene and trait distributions for each person,
+    in the format of `probabilities` in `heredity.main`, by variable
+    elimination over the family's per-person factors built from `probs`
+    (laid out like `heredity.PROBS`).
+    """
+    factors = person_factors(people, probs)
+    probabilities = {}
+    for person in people:
+        genes = gene_posterior(factors, person)
+        probabilities[person] = {
+            "gene": genes,
+            "trait": trait_posterior(people[person]["trait"], genes, probs),
+        }
+    return probabilities
@@ -0,0 +1,103 @@
+import numpy as np
+
+from inference import GENES, child_gene_probability
+
+# Gene assignments scored per block, as rows of a (block, people) array
+BLOCK_SIZE = 3 ** 10
+
+
+def inheritance_table(probs):
+    """
+    Return an array where [m, f, c] is the probability that a child has
+    c copies of the gene given that their mother has m and father has f.
+    """
+    table = np.zeros((3, 3, 3))
+    for m in GENES:
+        for f in GENES:
+            for c in GENES:
+                table[m, f, c] = child_gene_probability(c, m, f, probs)
+    return table
+
+
+def gene_assignments(start, stop, n):
+    """
+    Return the gene assignments numbered `start` to `stop` as an array
+    with one row per assignment and one column per person, where an
+    assignment's number written in base 3 gives each person's genes.
+    """
+    codes = np.arange(start, stop, dtype=np.int64)
+    powers = 3 ** np.arange(n, dtype=np.int64)
+    return (codes[:, None] // powers) % 3
+
+
+def score(genes, parents, prior, inherit, likelihood):
+    """
+    Return the probability of each row of `genes`, times the likelihood
+    of the known traits.
+
+    `parents[i]` is None for a person without parents in the data,
+    or the columns of their mother and father.
+    """
+    p = np.ones(len(genes))
+    for i, columns in enumerate(parents):
+        if columns is None:
+            p *= prior[genes[:, i]]
+        else:
+            mother, father = columns
+            p *= inherit[genes[:, mother], genes[:, father], genes[:, i]]
+        p *= likelihood[i][genes[:, i]]
+    return p
+
+
+def vectorized_probabilities(people, probs, block_size=BLOCK_SIZE):
+    """
+    Return normalized gene and trait distributions for each person,
+    in the format of `probabilities` in `heredity.main`.
+
+    Every gene assignment is encoded as a base-3 integer and scored in
+    blocks with array operations, and each person's gene distribution is
+    accumulated with one `bincount` per block. Traits are not enumerated:
+    known traits weight each assignment, and unknown traits are
+    computed from the gene distribution at the end.
+    """
+    names = list(people)
+    column = {name: i for i, name in enumerate(names)}
+    n = len(names)
+
+    prior = np.array([probs["gene"][g] for g in range(3)])
+    inherit = inheritance_table(probs)
+    has_trait = np.array([probs["trait"][g][True] for g in range(3)])
+    parents = []
+    likelihood = []
+    for name in names:
+        mother, father = people[name]["mother"], people[name]["father"]
+        parents.append(
+            None if not mother and not father
+            else (column[mother], column[father])
+        )
+        trait = people[name]["trait"]
+        if trait is None:
+            likelihood.append(np.ones(3))
+        else:
+            likelihood.append(has_trait if trait else 1 - has_trait)
+
+    totals = np.zeros((n, 3))
+    for start in range(0, 3 ** n, block_size):
+        genes = gene_assignments(start, min(start + block_size, 3 ** n), n)
+        p = score(genes, parents, prior, inherit, likelihood)
+        for i in range(n):
+            totals[i] += np.bincount(genes[:, i], weights=p, minlength=3)
+
+    probabilities = {}
+    for i, name in enumerate(names):
+        gene = totals[i] / totals[i].sum()
+        trait = people[name]["trait"]
+        if trait is None:
+            with_trait = float(gene @ has_trait)
+        else:
+            with_trait = float(trait)
+        probabilities[name] = {
+            "gene": {g: float(gene[g]) for g in GENES},
+            "trait": {True: with_trait, False: 1 - with_trait},
+        }
+    return probabilities
@@ -0,0 +1,142 @@
+import argparse
+import itertools
+import random
+import tempfile
+import time
+import tracemalloc
+
+import edgelist
+import pagerank
+
+# Corpus shapes: how skewed link targets are, and the share of dangling pages
+KINDS = {
+    "uniform": {"skew": 0, "dangling": 0},
+    "power-law": {"skew": 1, "dangling": 0},
+    "dangling": {"skew": 1, "dangling": 0.2},
+}
+
+# Largest corpus each method is run on; the original two are O(pages) per
+# sample and O(pages ** 2) per iteration
+METHODS = {
+    "sample": 1000,
+    "iterate": 1000,
+    "fast-sample": 10 ** 6,
+    "vectorized-sample": 10 ** 6,
+    "parallel-sample": 10 ** 6,
+    "power": 10 ** 6,
+    "gauss-seidel": 10 ** 6,
+    "aitken": 10 ** 6,
+    "quadratic": 10 ** 6,
+    "edge-list": 10 ** 6,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark PageRank methods on synthetic corpora."
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000],
+        help="numbers of pages to benchmark (up to 1000000)"
+    )
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--links", type=float, default=8, help="mean links per page")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-memory", action="store_true",
+        help="skip the second, traced run that measures peak memory"
+    )
+    args = parser.parse_args()
+
+    print(f"{'kind':<10} {'pages':>8} {'method':<18} {'seconds':>9} {'peak MB':>9} {'L1 error':>10}")
+    for kind, size in itertools.product(args.kinds, args.sizes):
+        corpus = generate_corpus(size, args.links, seed=args.seed, **KINDS[kind])
+        reference = pagerank.matrix_pagerank(
+            corpus, pagerank.DAMPING, tolerance=1e-12, max_iterations=10000
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            edgelist.write_corpus(directory, corpus)
+            for method in args.methods:
+                if size > METHODS[method]:
+                    continue
+                run = runner(method, corpus, directory, args.samples, args.seed)
+                seconds, ranks = timed(run)
+                peak = "-" if args.no_memory else f"{peak_memory(run) / 2 ** 20:9.1f}"
+                error = sum(abs(ranks[page] - reference[page]) for page in reference)
+                print(f"{kind:<10} {size:>8} {method:<18} {seconds:9.3f} {peak:>9} {error:10.2e}")
+
+
+def generate_corpus(n, links=8, skew=1, dangling=0, seed=0):
+    """
+    Return a random corpus of `n` pages, in the format `crawl` returns.
+
+    Each page has on average about `links` links, unless it is one of
+    the `dangling` share of pages that have none. Link targets are drawn
+    with probability proportional to 1 / rank ** `skew`, so a `skew`
+    of 1 gives the power-law in-degrees of real link graphs and 0 gives
+    uniformly random targets.
+    """
+    rng = random.Random(seed)
+    pages = [f"{i}.html" for i in range(n)]
+    weights = list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(n)))
+
+    corpus = {}
+    for page in pages:
+        if rng.random() < dangling:
+            corpus[page] = set()
+            continue
+        count = min(n - 1, int(rng.expovariate(1 / links)) + 1)
+        corpus[page] = set(rng.choices(pages, cum_weights=weights, k=count)) - {page}
+    return corpus
+
+
+def runner(method, corpus, directory, samples, seed):
+    """
+    Return a function of no arguments that runs `method` on `corpus`.
+    """
+    damping = pagerank.DAMPING
+    if method == "sample":
+        return lambda: pagerank.sample_pagerank(corpus, damping, samples)
+    if method == "iterate":
+        return lambda: pagerank.iterate_pagerank(corpus, damping)
+    if method == "fast-sample":
+        return lambda: pagerank.fast_sample_pagerank(corpus, damping, samples)
+    if method == "vectorized-sample":
+        return lambda: pagerank.parallel_sample_pagerank(
+            corpus, damping, samples, seed=seed, vectorized=True
+        )
+    if method == "parallel-sample":
+        return lambda: pagerank.parallel_sample_pagerank(
+            corpus, damping, samples, seed=seed
+        )
+    if method == "edge-list":
+        return lambda: pagerank.edge_list_pagerank(directory, damping)
+    return lambda: pagerank.matrix_pagerank(corpus, damping, method=method)
+
+
+def timed(run):
+    """
+    Return the wall time taken by `run` and its result.
+    """
+    start = time.perf_counter()
+    result = run()
+    return time.perf_counter() - start, result
+
+
+def peak_memory(run):
+    """
+    Return the peak bytes allocated by Python and NumPy while `run`
+    runs in this process. Work done in child processes is not counted.
+    """
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import os
+import time
+
+import numpy as np
+
+from tracing import record_iteration
+
+# Files of an edge list directory
+PAGES = "pages.txt"
+SOURCES = "sources.int32"
+TARGETS = "targets.int32"
+
+# Links read into memory at once, by default
+BLOCK_SIZE = 1 << 22
+
+
+class EdgeList():
+    """
+    Link graph stored on disk as an edge list directory:
+        pages.txt       one page name per line, numbered from 0
+        sources.int32   raw int32 source page number of each link
+        targets.int32   raw int32 target page number of each link
+    The link arrays are memory-mapped, so only the blocks being
+    read at any moment need to be in memory.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, PAGES), encoding="utf-8") as f:
+            self.pages = f.read().splitlines()
+        self.sources = _map(os.path.join(directory, SOURCES))
+        self.targets = _map(os.path.join(directory, TARGETS))
+        if len(self.sources) != len(self.targets):
+            raise ValueError(f"{directory} has mismatched link arrays")
+
+        self.out_degree = np.zeros(len(self.pages), dtype=np.int64)
+        for sources, _ in self.blocks():
+            self.out_degree += np.bincount(sources, minlength=len(self.pages))
+        self.dangling = self.out_degree == 0
+
+    def __len__(self):
+        return len(self.pages)
+
+    def blocks(self, block_size=BLOCK_SIZE):
+        """
+        Yields (sources, targets) arrays of up to `block_size` links.
+        """
+        for start in range(0, len(self.sources), block_size):
+            end = start + block_size
+            yield (
+                np.asarray(self.sources[start:end], dtype=np.int64),
+                np.asarray(self.targets[start:end], dtype=np.int64),
+            )
+
+    def to_dict(self, rank):
+        """
+        Returns a dictionary mapping page names to their values in `rank`.
+        """
+        return {page: float(value) for page, value in zip(self.pages, rank)}
+
+
+def write_edge_list(directory, pages, links, block_size=BLOCK_SIZE):
+    """
+    Writes an edge list directory from a sequence of page names and an
+    iterable of (source, target) page number pairs, buffering at most
+    `block_size` links in memory at a time.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, PAGES), "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(page + "\n")
+
+    with open(os.path.join(directory, SOURCES), "wb") as sources, \
+            open(os.path.join(directory, TARGETS), "wb") as targets:
+        block = []
+        for link in links:
+            block.append(link)
+            if len(block) == block_size:
+                _write_block(block, sources, targets)
+                block = []
+        if block:
+            _write_block(block, sources, targets)
+
+
+def write_corpus(directory, corpus):
+    """
+    Writes a corpus, as returned by `crawl`, as an edge list directory.
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    links = (
+        (index[page], index[link])
+        for page in pages
+        for link in sorted(corpus[page])
+    )
+    write_edge_list(directory, pages, links)
+
+
+def streaming_power_iteration(edges, damping_factor, tolerance, max_iterations,
+                              block_size=BLOCK_SIZE, trace=None):
+    """
+    Returns the PageRank vector of an EdgeList by power iteration,
+    reading the links one block at a time on every iteration, so memory
+    use is bounded by the number of pages plus `block_size` links.
+    Stopping rules and `trace` are as for `linkmatrix.power_iteration`.
+    """
+    n = len(edges)
+    rank = np.full(n, 1 / n)
+    for iteration in range(1, max_iterations + 1):
+        began = time.perf_counter()
+        share = np.zeros(n)
+        linked = ~edges.dangling
+        share[linked] = rank[linked] / edges.out_degree[linked]
+
+        spread = np.zeros(n)
+        for sources, targets in edges.blocks(block_size):
+            spread += np.bincount(targets, weights=share[sources], minlength=n)
+        spread += rank[edges.dangling].sum() / n
+
+        new_rank = (1 - damping_factor) / n + damping_factor * spread
+        residual = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if trace is not None:
+            record_iteration(trace, iteration, residual, began)
+        if residual < tolerance:
+            break
+    return rank
+
+
+def _map(filename):
+    """
+    Memory-maps a raw int32 file, allowing for an empty file.
+    """
+    if os.path.getsize(filename) == 0:
+        return np.zeros(0, dtype=np.int32)
+    return np.memmap(filename, dtype=np.int32, mode="r")
+
+
+def _write_block(block, sources, targets):
+    pairs = np.array(block, dtype=np.int32).reshape(-1, 2)
+    pairs[:, 0].tofile(sources)
+    pairs[:, 1].tofile(targets)
@@ -0,0 +1,261 @@
+import time
+from functools import partial
+
+import numpy as np
+
+from tracing import record_iteration
+
+
+class LinkMatrix():
+    """
+    Sparse column-stochastic transition matrix of a corpus.
+
+    Pages are numbered by their position in `pages`, and each link is an
+    entry of the parallel `sources` and `targets` arrays, weighted by
+    1 / (number of links on its source page). Pages without links are
+    `dangling` and, as in `transition_model`, link to every page.
+    """
+
+    def __init__(self, pages, sources, targets):
+        self.pages = list(pages)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        self.sources = np.asarray(sources, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+
+        n = len(self.pages)
+        self.out_degree = np.bincount(self.sources, minlength=n)
+        self.dangling = self.out_degree == 0
+        self.weights = 1 / self.out_degree[self.sources]
+
+        # Links grouped by target, for multiplying several vectors at once
+        order = np.argsort(self.targets, kind="stable")
+        self.sorted_sources = self.sources[order]
+        self.sorted_targets = self.targets[order]
+        self.sorted_weights = self.weights[order]
+        self.linked, self.group_starts = np.unique(
+            self.targets[order], return_index=True
+        )
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build the matrix from a dictionary mapping each page
+        to the set of pages it links to, like `crawl` returns.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        sources = []
+        targets = []
+        for page in pages:
+            for link in corpus[page]:
+                sources.append(index[page])
+                targets.append(index[link])
+        return cls(pages, sources, targets)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def multiply(self, rank):
+        """
+        Returns the probability of being on each page after following
+        one link from the distribution `rank`, or from each column
+        of `rank` if it is a matrix with one row per page.
+        """
+        n = len(self.pages)
+        if rank.ndim == 1:
+            spread = np.bincount(
+                self.targets, weights=rank[self.sources] * self.weights, minlength=n
+            )
+        else:
+            spread = np.zeros(rank.shape)
+            if len(self.linked):
+                flows = rank[self.sorted_sources] * self.sorted_weights[:, None]
+                spread[self.linked] = np.add.reduceat(flows, self.group_starts, axis=0)
+        return spread + rank[self.dangling].sum(axis=0) / n
+
+    def from_dict(self, values, default=0):
+        """
+        Returns an array of the values for each page in a dictionary
+        mapping page names to values, using `default` for missing pages.
+        """
+        return np.array([values.get(page, default) for page in self.pages], dtype=float)
+
+    def to_dict(self, rank):
+        """
+        Returns a dictionary mapping page names to their values in `rank`.
+        """
+        return {page: float(value) for page, value in zip(self.pages, rank)}
+
+
+def solve(matrix, damping_factor, tolerance, max_iterations, method="power",
+          start=None, teleport=None, trace=None):
+    """
+    Returns the PageRank vector of `matrix` using the solver named by
+    `method`, one of METHODS. All solvers take the same arguments
+    as `power_iteration`; only "power" accepts a matrix `teleport`.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected one of {sorted(METHODS)}")
+    if method != "power" and teleport is not None and np.ndim(teleport) != 1:
+        raise ValueError(f"Method {method!r} only supports a single teleport vector")
+    return METHODS[method](
+        matrix, damping_factor, tolerance, max_iterations,
+        start=start, teleport=teleport, trace=trace
+    )
+
+
+def power_iteration(matrix, damping_factor, tolerance, max_iterations,
+                    start=None, teleport=None, trace=None):
+    """
+    Returns the PageRank vector of `matrix`, starting from `start`
+    (by default the teleport distribution) and stopping once an iteration
+    changes the vector by less than `tolerance` in L1 norm,
+    or after `max_iterations`.
+
+    With probability 1 - `damping_factor` the surfer jumps to a page
+    drawn from `teleport`, by default the uniform distribution. If
+    `teleport` is a matrix with one distribution per column, one PageRank
+    vector is computed per column, all in the same pass over the links,
+    and iteration stops once every column has converged.
+
+    If `trace` is a list, a dictionary with the iteration number,
+    L1 `residual` and wall-clock `seconds` of each iteration
+    is appended to it.
+    """
+    n = len(matrix)
+    if teleport is None:
+        teleport = np.full(n, 1 / n)
+    rank = teleport if start is None else np.asarray(start, dtype=float)
+    for iteration in range(1, max_iterations + 1):
+        began = time.perf_counter()
+        new_rank = (1 - damping_factor) * teleport + damping_factor * matrix.multiply(rank)
+        residual = np.abs(new_rank - rank).sum(axis=0).max()
+        rank = new_rank
+        if trace is not None:
+            record_iteration(trace, iteration, residual, began)
+        if residual < tolerance:
+            break
+    return rank
+
+
+def gauss_seidel(matrix, damping_factor, tolerance, max_iterations,
+                 start=None, teleport=None, trace=None, blocks=256):
+    """
+    Returns the PageRank vector of `matrix` by block Gauss-Seidel
+    iteration: pages are updated in `blocks` consecutive blocks, and
+    each block already uses the values updated earlier in the same
+    sweep. On corpora of loosely linked clusters this needs fewer sweeps
+    than power iteration. Arguments are as for `power_iteration`.
+    """
+    n = len(matrix)
+    if teleport is None:
+        teleport = np.full(n, 1 / n)
+    rank = np.array(teleport if start is None else start, dtype=float)
+
+    bounds = np.linspace(0, n, min(blocks, n) + 1).astype(np.int64)
+    edge_bounds = np.searchsorted(matrix.sorted_targets, bounds)
+    flow_weights = matrix.sorted_weights
+
+    for iteration in range(1, max_iterations + 1):
+        began = time.perf_counter()
+        dangling_mass = rank[matrix.dangling].sum()
+        residual = 0
+        for block in range(len(bounds) - 1):
+            low, high = bounds[block], bounds[block + 1]
+            first, last = edge_bounds[block], edge_bounds[block + 1]
+            incoming = np.bincount(
+                matrix.sorted_targets[first:last] - low,
+                weights=rank[matrix.sorted_sources[first:last]] * flow_weights[first:last],
+                minlength=high - low
+            )
+            new_block = (1 - damping_factor) * teleport[low:high] + damping_factor * (
+                incoming + dangling_mass / n
+            )
+            change = new_block - rank[low:high]
+            dangling_mass += change[matrix.dangling[low:high]].sum()
+            residual += np.abs(change).sum()
+            rank[low:high] = new_block
+
+        # Keep the total at 1, which the partial updates do not preserve
+        rank /= rank.sum()
+
+        if trace is not None:
+            record_iteration(trace, iteration, residual, began)
+        if residual < tolerance:
+            break
+
+    return rank
+
+
+def extrapolated_iteration(matrix, damping_factor, tolerance, max_iterations,
+                           start=None, teleport=None, trace=None,
+                           extrapolation="quadratic", period=10):
+    """
+    Returns the PageRank vector of `matrix` by power iteration, where
+    every `period` iterations the latest iterates are combined into an
+    estimate of the limit, removing the slowest-decaying error terms.
+
+    "aitken" applies Aitken's delta-squared process to each page's last
+    three values, and "quadratic" fits the last four iterates as in
+    Kamvar et al., "Extrapolation Methods for Accelerating PageRank
+    Computations". Other arguments are as for `power_iteration`.
+    """
+    n = len(matrix)
+    if teleport is None:
+        teleport = np.full(n, 1 / n)
+    rank = teleport if start is None else np.asarray(start, dtype=float)
+    history = [rank]
+
+    for iteration in range(1, max_iterations + 1):
+        began = time.perf_counter()
+        new_rank = (1 - damping_factor) * teleport + damping_factor * matrix.multiply(rank)
+        residual = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        history = history[-3:] + [rank]
+
+        if iteration % period == 0 and residual >= tolerance:
+            if extrapolation == "aitken":
+                rank = _aitken(*history[-3:])
+            else:
+                rank = _quadratic(*history)
+            history = [rank]
+
+        if trace is not None:
+            record_iteration(trace, iteration, residual, began)
+        if residual < tolerance:
+            break
+
+    return rank
+
+
+def _aitken(x0, x1, x2):
+    """
+    Returns the Aitken delta-squared extrapolation of three iterates,
+    keeping the latest value wherever the denominator vanishes.
+    """
+    second = x2 - 2 * x1 + x0
+    safe = np.abs(second) > 1e-15
+    rank = x2.copy()
+    rank[safe] = x2[safe] - (x2[safe] - x1[safe]) ** 2 / second[safe]
+    rank = np.abs(rank)
+    return rank / rank.sum()
+
+
+def _quadratic(x0, x1, x2, x3):
+    """
+    Returns the quadratic extrapolation of four iterates.
+    """
+    y = np.column_stack((x1 - x0, x2 - x0))
+    gamma1, gamma2 = -np.linalg.lstsq(y, x3 - x0, rcond=None)[0]
+    gamma3 = 1
+    rank = (gamma1 + gamma2 + gamma3) * x1 + (gamma2 + gamma3) * x2 + gamma3 * x3
+    rank = np.abs(rank)
+    return rank / rank.sum()
+
+
+METHODS = {
+    "power": power_iteration,
+    "gauss-seidel": gauss_seidel,
+    "aitken": partial(extrapolated_iteration, extrapolation="aitken"),
+    "quadratic": extrapolated_iteration,
+}
@@ -1,42 +1,96 @@
+import json
 import os
 import random
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sampling import link_lists, parallel_walk, random_walk, vectorized_walk
+from tracing import record_iteration
+
+# linkmatrix and edgelist need NumPy, so the functions using them import
+# them when called, and the default sampling and iteration do without it
 
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Links in an HTML page
+LINK_PATTERN = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Per-directory file of links already extracted by `crawl`
+CRAWL_CACHE = ".crawl_cache.json"
+
+# Convergence settings for the sparse solver
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 1000
+
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python pagerank.py corpus [trace.jsonl]")
     corpus = crawl(sys.argv[1])
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
-    print(f"PageRank Results from Iteration")
+    trace = []
+    ranks = iterate_pagerank(corpus, DAMPING, trace=trace)
+    print(f"PageRank Results from Iteration ({len(trace)} iterations)")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
+    if len(sys.argv) == 3:
+        write_trace(trace, sys.argv[2])
 
 
-def crawl(directory):
+def crawl(directory, cache=False, threads=1):
     """
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
+
+    If `cache` is true, the links found in each file are stored in
+    CRAWL_CACHE in `directory` with the file's size and modification
+    time, and only new or changed files are parsed again.
+    Files are read and parsed by a pool of `threads` threads.
     """
-    pages = dict()
+    filenames = [
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    ]
 
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+    cached = _load_crawl_cache(directory) if cache else {}
+    stats = {
+        filename: os.stat(os.path.join(directory, filename))
+        for filename in filenames
+    }
+
+    pages = dict()
+    stale = []
+    for filename in filenames:
+        entry = cached.get(filename)
+        stat = stats[filename]
+        if entry is not None and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+            pages[filename] = set(entry[2])
+        else:
+            stale.append(filename)
+
+    # Extract all links from new or changed HTML files
+    paths = [os.path.join(directory, filename) for filename in stale]
+    if threads > 1 and len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            found = list(pool.map(_extract_links, paths))
+    else:
+        found = [_extract_links(path) for path in paths]
+    for filename, links in zip(stale, found):
+        pages[filename] = links - {filename}
+
+    if cache and (stale or set(cached) != set(filenames)):
+        _save_crawl_cache(directory, {
+            filename: [stats[filename].st_size, stats[filename].st_mtime_ns,
+                       sorted(pages[filename])]
+            for filename in filenames
+        })
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -45,6 +99,49 @@ def crawl(directory):
     return pages
 
 
+def _extract_links(path):
+    """
+    Return the set of link targets in an HTML file.
+    """
+    with open(path) as f:
+        return set(LINK_PATTERN.findall(f.read()))
+
+
+def _load_crawl_cache(directory):
+    """
+    Return the crawl cache of `directory`, or an empty
+    dictionary if there is none or it cannot be read.
+    Malformed entries are left out, so their files are parsed again.
+    """
+    try:
+        with open(os.path.join(directory, CRAWL_CACHE)) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cached, dict):
+        return {}
+    return {
+        filename: entry for filename, entry in cached.items()
+        if isinstance(entry, list) and len(entry) == 3
+        and isinstance(entry[2], list)
+        and all(isinstance(link, str) for link in entry[2])
+    }
+
+
+def _save_crawl_cache(directory, cached):
+    """
+    Write the crawl cache of `directory`, skipping it
+    if the directory is not writable.
+    """
+    path = os.path.join(directory, CRAWL_CACHE)
+    try:
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(cached, f)
+        os.replace(f"{path}.tmp", path)
+    except OSError:
+        pass
+
+
 def transition_model(corpus, page, damping_factor):
     """
     Return a probability distribution over which page to visit next,
@@ -108,10 +205,48 @@ def sample_pagerank(corpus, damping_factor, n):
     return proportionDistribution
 
 
-def iterate_pagerank(corpus, damping_factor):
+def fast_sample_pagerank(corpus, damping_factor, n):
+    """
+    Return PageRank values for each page by sampling `n` pages, like
+    `sample_pagerank`, but drawing each step in O(1) time instead of
+    building the full transition model for every sample.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    pages, links = link_lists(corpus)
+    counts = random_walk(links, damping_factor, n)
+    return {page: count / n for page, count in zip(pages, counts)}
+
+
+def parallel_sample_pagerank(corpus, damping_factor, n, walkers=None,
+                             seed=None, vectorized=False):
+    """
+    Return PageRank values for each page by sampling `n` pages split
+    across independent random walkers, either run in a process pool or,
+    if `vectorized`, advanced together with NumPy. A given `seed` and
+    number of walkers always give the same result.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    pages, links = link_lists(corpus)
+    if vectorized:
+        counts = vectorized_walk(links, damping_factor, n, walkers, seed)
+    else:
+        counts = parallel_walk(links, damping_factor, n, walkers, seed)
+    return {page: count / n for page, count in zip(pages, counts)}
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=0.001, trace=None):
     """
     Return PageRank values for each page by iteratively updating
-    PageRank values until convergence.
+    PageRank values until no page changes by `tolerance` or more.
+
+    If `trace` is a list, a record of each iteration is appended to it,
+    as described in `write_trace`.
 
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
@@ -126,7 +261,11 @@ def iterate_pagerank(corpus, damping_factor):
     for p in corpus:
         rankDistribution[p] = 1 / N
 
+    iteration = 0
     while True:
+        iteration += 1
+        start = time.perf_counter()
+        residual = 0
         count = 0
         for key in corpus:
 
@@ -138,15 +277,164 @@ def iterate_pagerank(corpus, damping_factor):
 
             pr = (1 - d) / N + (d * sigma)
 
-            if abs(rankDistribution[key] - pr) < 0.001:
+            change = abs(rankDistribution[key] - pr)
+            residual += change
+            if change < tolerance:
                 count += 1
             rankDistribution[key] = pr
 
+        if trace is not None:
+            record_iteration(trace, iteration, residual, start)
+
         if count == N:
             break
 
     return rankDistribution
 
 
+def matrix_pagerank(corpus, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, trace=None, method="power"):
+    """
+    Return PageRank values for each page by iterating over a sparse
+    transition matrix, which costs O(pages + links) per iteration.
+
+    `method` selects the solver: "power" (power iteration),
+    "gauss-seidel" (in-place block updates), or "aitken" or "quadratic"
+    (power iteration with periodic extrapolation). The alternatives
+    need fewer iterations when the damping factor is high and the
+    corpus is made of loosely connected clusters.
+
+    Iteration stops once the L1 change in the PageRank values is below
+    `tolerance`, or after `max_iterations` iterations. If `trace` is a
+    list, a record of each iteration is appended to it, as described
+    in `write_trace`.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    from linkmatrix import LinkMatrix, solve
+
+    matrix = LinkMatrix.from_corpus(corpus)
+    rank = solve(
+        matrix, damping_factor, tolerance, max_iterations,
+        method=method, trace=trace
+    )
+    return matrix.to_dict(rank)
+
+
+def update_pagerank(corpus, ranks, damping_factor, add_pages=(),
+                    remove_pages=(), add_links=(), remove_links=(),
+                    tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS,
+                    method="power"):
+    """
+    Return the corpus and PageRank values after a change to the corpus,
+    starting power iteration from the previous PageRank values `ranks`
+    rather than from the uniform distribution.
+
+    `add_pages` and `remove_pages` are page names, and `add_links` and
+    `remove_links` are (page, linked page) pairs. Links to removed pages
+    are dropped, and links to pages not in the corpus are ignored,
+    as in `crawl`. `corpus` itself is not modified.
+
+    New pages start with the average PageRank value, and the starting
+    values are rescaled to sum to 1. When only a few pages change, the
+    previous values are already close to the new ones and far fewer
+    iterations are needed than from a uniform start. `method` selects
+    the solver, as for `matrix_pagerank`.
+    """
+    from linkmatrix import LinkMatrix, solve
+
+    removed = set(remove_pages)
+    corpus = {
+        page: set(links) - removed
+        for page, links in corpus.items()
+        if page not in removed
+    }
+    for page in add_pages:
+        corpus.setdefault(page, set())
+    for page, link in remove_links:
+        if page in corpus:
+            corpus[page].discard(link)
+    for page, link in add_links:
+        if page in corpus and link in corpus and link != page:
+            corpus[page].add(link)
+
+    matrix = LinkMatrix.from_corpus(corpus)
+    start = matrix.from_dict(ranks, default=1 / len(matrix))
+    start /= start.sum()
+    rank = solve(
+        matrix, damping_factor, tolerance, max_iterations,
+        method=method, start=start
+    )
+    return corpus, matrix.to_dict(rank)
+
+
+def personalized_pagerank(corpus, damping_factor, seed_sets,
+                          tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Return personalized PageRank values for each set of seed pages in
+    `seed_sets`, where the surfer jumps to one of the seed pages
+    (chosen at random) instead of to any page in the corpus.
+
+    All seed sets are solved together: each iteration multiplies one
+    matrix with a column per seed set, so the link structure is read
+    once per iteration however many seed sets there are.
+
+    Return a list with one dictionary per seed set, where keys are page
+    names, and values are their PageRank value for that seed set.
+    """
+    import numpy as np
+    from linkmatrix import LinkMatrix, power_iteration
+
+    matrix = LinkMatrix.from_corpus(corpus)
+    teleport = np.zeros((len(matrix), len(seed_sets)))
+    for column, seeds in enumerate(seed_sets):
+        rows = [matrix.index[page] for page in seeds]
+        if not rows:
+            raise ValueError("Each seed set needs at least one page")
+        teleport[rows, column] = 1 / len(rows)
+
+    ranks = power_iteration(
+        matrix, damping_factor, tolerance, max_iterations, teleport=teleport
+    )
+    return [matrix.to_dict(ranks[:, column]) for column in range(len(seed_sets))]
+
+
+def edge_list_pagerank(directory, damping_factor, tolerance=TOLERANCE,
+                       max_iterations=MAX_ITERATIONS, trace=None):
+    """
+    Return PageRank values for each page of a corpus stored as an edge
+    list directory (see `edgelist.write_corpus`), by power iteration
+    that streams the memory-mapped links in blocks, for corpora whose
+    links do not fit in memory.
+
+    Stopping rules and `trace` are as for `matrix_pagerank`.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    from edgelist import EdgeList, streaming_power_iteration
+
+    edges = EdgeList(directory)
+    rank = streaming_power_iteration(
+        edges, damping_factor, tolerance, max_iterations, trace=trace
+    )
+    return edges.to_dict(rank)
+
+
+def write_trace(trace, filename):
+    """
+    Write the iteration records collected in `trace` to a file,
+    one JSON object per line. Each record has the iteration number,
+    the L1 `residual` (total change in PageRank values during the
+    iteration) and the wall-clock `seconds` the iteration took.
+    """
+    with open(filename, "w") as f:
+        for record in trace:
+            f.write(json.dumps(record) + "\n")
+
+
 if __name__ == "__main__":
     main()
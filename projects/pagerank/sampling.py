@@ -0,0 +1,125 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+# Link lists for walkers in pool processes, set once per process
+_links = None
+
+
+def link_lists(corpus):
+    """
+    Returns the sorted page names of a corpus and, for each page by
+    position, a tuple of the positions of the pages it links to.
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    links = [tuple(index[link] for link in sorted(corpus[page])) for page in pages]
+    return pages, links
+
+
+def random_walk(links, damping_factor, n, rng=random):
+    """
+    Returns how many times each page is visited in a walk of `n` pages
+    over `links`, starting with a page at random.
+
+    Each step is a two-stage draw equivalent to `transition_model`:
+    with probability `damping_factor` follow a random link of the current
+    page, otherwise (or if the page has no links) jump to a page chosen
+    uniformly at random. Both stages are O(1), so no per-page
+    distribution is ever built.
+    """
+    num_pages = len(links)
+    counts = [0] * num_pages
+    if n <= 0:
+        return counts
+
+    uniform = rng.random
+    page = int(uniform() * num_pages)
+    counts[page] += 1
+    for _ in range(n - 1):
+        outgoing = links[page]
+        if outgoing and uniform() < damping_factor:
+            page = outgoing[int(uniform() * len(outgoing))]
+        else:
+            page = int(uniform() * num_pages)
+        counts[page] += 1
+    return counts
+
+
+def parallel_walk(links, damping_factor, n, walkers=None, seed=None):
+    """
+    Returns visit counts for `n` samples split across independent
+    random walks, one per walker, run in a pool of processes.
+
+    Walker i is seeded from (`seed`, i), so a given seed and number of
+    walkers always produce the same counts. Counts are summed at the end.
+    """
+    walkers = walkers or os.cpu_count() or 1
+    shares = [n // walkers + (1 if i < n % walkers else 0) for i in range(walkers)]
+    tasks = [
+        (damping_factor, share, f"{seed}-{i}" if seed is not None else None)
+        for i, share in enumerate(shares) if share > 0
+    ]
+
+    counts = [0] * len(links)
+    with ProcessPoolExecutor(
+        max_workers=min(len(tasks), os.cpu_count() or 1) or 1,
+        initializer=_set_links, initargs=(links,)
+    ) as pool:
+        for walker_counts in pool.map(_walk, tasks):
+            for page, count in enumerate(walker_counts):
+                counts[page] += count
+    return counts
+
+
+def _set_links(links):
+    global _links
+    _links = links
+
+
+def _walk(task):
+    damping_factor, n, seed = task
+    return random_walk(_links, damping_factor, n, random.Random(seed))
+
+
+def vectorized_walk(links, damping_factor, n, walkers=None, seed=None):
+    """
+    Returns visit counts for `n` samples from `walkers` random walks
+    advanced together with NumPy, one array operation per step for
+    all walkers, until `n` pages have been visited in total.
+
+    Every walk starts at a page chosen uniformly at random, so walks
+    must be long for the start not to bias the counts; by default
+    there is one walker per 1000 samples, up to 4096 walkers.
+    """
+    # Imported here so that NumPy is only needed for this walk
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    num_pages = len(links)
+    out_degree = np.array([len(outgoing) for outgoing in links], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(out_degree)))
+    targets = np.fromiter(
+        (page for outgoing in links for page in outgoing),
+        dtype=np.int64, count=int(offsets[-1])
+    )
+
+    counts = np.zeros(num_pages, dtype=np.int64)
+    if walkers is None:
+        walkers = min(4096, n // 1000)
+    walkers = max(1, min(walkers, n))
+    position = rng.integers(num_pages, size=walkers)
+    remaining = n
+    while remaining > 0:
+        visited = position[:remaining]
+        counts += np.bincount(visited, minlength=num_pages)
+        remaining -= len(visited)
+
+        degree = out_degree[position]
+        follow = (rng.random(walkers) < damping_factor) & (degree > 0)
+        jump = ~follow
+        position[jump] = rng.integers(num_pages, size=int(jump.sum()))
+        chosen = (rng.random(int(follow.sum())) * degree[follow]).astype(np.int64)
+        position[follow] = targets[offsets[position[follow]] + chosen]
+
+    return counts.tolist()
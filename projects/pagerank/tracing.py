@@ -0,0 +1,13 @@
+import time
+
+
+def record_iteration(trace, iteration, residual, began):
+    """
+    Appends the record of one iteration, which began at
+    time.perf_counter() value `began`, to `trace`.
+    """
+    trace.append({
+        "iteration": iteration,
+        "residual": float(residual),
+        "seconds": time.perf_counter() - began,
+    })